@@ -0,0 +1,110 @@
+"""
+Description: CPU and memory profiler for weather processor actions.
+Author: Jake Licmo
+Date: 2026-10-19
+"""
+import os
+import io
+import cProfile
+import pstats
+import threading
+import tracemalloc
+from datetime import datetime
+
+
+class ActionProfiler:
+    """
+    Runs actions under cProfile, and optionally tracemalloc, and writes
+    a hotspot report plus the raw profile for each run.
+    """
+
+    def __init__(self, output_dir, track_allocations=False, top=30):
+        """
+        Initializes the profiler.
+        :param output_dir: Directory the report and profile files are written to.
+        :param track_allocations: Also record memory allocations with tracemalloc.
+        :param top: Number of entries listed in each section of the report.
+        """
+        self.output_dir = output_dir
+        self.track_allocations = track_allocations
+        self.top = top
+        # Only one run is profiled at a time since tracemalloc is process-wide
+        self.lock = threading.Lock()
+
+    def run(self, action, *args, **kwargs):
+        """
+        Runs an action under the profiler and writes its report.
+        :param action: The function or bound method to run.
+        :return: Whatever the action returns.
+        """
+        name = getattr(action, "__name__", "action")
+        # Don't wait for another profiled run, so a hung run can't block every caller
+        if not self.lock.acquire(blocking=False):
+            print(f"Profiler is busy, running {name} without profiling.")
+            return action(*args, **kwargs)
+
+        try:
+            profiler = cProfile.Profile()
+            if self.track_allocations:
+                tracemalloc.start()
+
+            started = datetime.now()
+            profiler.enable()
+            try:
+                return action(*args, **kwargs)
+            finally:
+                profiler.disable()
+                snapshot = None
+                if self.track_allocations:
+                    # Leave out memory allocated by the profiler itself
+                    snapshot = tracemalloc.take_snapshot().filter_traces([
+                        tracemalloc.Filter(False, tracemalloc.__file__),
+                        tracemalloc.Filter(False, __file__),
+                    ])
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                else:
+                    peak = None
+                # A failed report must never hide the action's own result or error
+                try:
+                    self.write_report(name, started, profiler, snapshot, peak)
+                except Exception as e:
+                    print(f"Failed to write profile for {name}: {e}")
+        finally:
+            self.lock.release()
+
+    def write_report(self, name, started, profiler, snapshot, peak):
+        """
+        Writes the raw profile (.prof) and a sorted text report (.txt) for one run.
+        :param name: Name of the profiled action.
+        :param started: Time the run started.
+        :param profiler: The cProfile.Profile used for the run.
+        :param snapshot: tracemalloc snapshot taken when the action returned,
+        or None if allocations were not tracked.
+        :param peak: Peak traced memory in bytes, or None.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"{name}_{started.strftime('%Y%m%d_%H%M%S_%f')}")
+        elapsed = (datetime.now() - started).total_seconds()
+
+        profiler.dump_stats(base + ".prof")
+
+        report = io.StringIO()
+        report.write(f"Profile of {name} started {started.strftime('%Y-%m-%d %H:%M:%S')}"
+                     f" ({elapsed:.2f}s)\n\n")
+        stats = pstats.Stats(profiler, stream=report).strip_dirs()
+        report.write("===== Top functions by own time =====\n")
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(self.top)
+        report.write("===== Top functions by cumulative time =====\n")
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+
+        if snapshot is not None:
+            report.write(f"Peak traced memory during run: {peak / 1024:.1f} KiB\n")
+            report.write("===== Top allocations still held at end of run =====\n")
+            for stat in snapshot.statistics("lineno")[:self.top]:
+                report.write(f"{stat}\n")
+
+        with open(base + ".txt", "w", encoding="utf-8") as report_file:
+            report_file.write(report.getvalue())
+
+        print(f"Profile written to {base}.txt and {base}.prof")
@@ -4,20 +4,140 @@ Author: Jake Licmo
 Date: 2025-03-28
 """
 import os
+import re
 import sys
 import csv
+import shutil
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from dbcm import DBCM
 
+PARTITION_LAYOUTS = ("station", "decade")
+
+# File names of partitions; anything else in the partition directory is ignored
+PARTITION_FILE_PATTERNS = {
+    "station": re.compile(r"station_.*_[0-9a-f]{8}\.db"),
+    "decade": re.compile(r"decade_(\d{4})\.db"),
+}
+
+
+def aggregate_partition(db_path, location, from_year, to_year):
+    """
+    Computes monthly mean temperature aggregates for one database file.
+    Defined at module level so it can run in a worker process.
+    :return: A list of (location, year, month, count, total, min, max) tuples.
+    """
+    query = '''
+        SELECT location,
+            CAST(substr(sample_date, 1, 4) AS INTEGER) AS year,
+            CAST(substr(sample_date, 6, 2) AS INTEGER) AS month,
+            COUNT(avg_temp), SUM(avg_temp), MIN(avg_temp), MAX(avg_temp)
+        FROM weather
+        WHERE CAST(substr(sample_date, 1, 4) AS INTEGER) BETWEEN ? AND ?
+    '''
+    params = [from_year, to_year]
+    if location is not None:
+        query += " AND location = ?"
+        params.append(location)
+    query += " GROUP BY location, year, month"
+
+    with DBCM(db_path) as cursor:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+
 class DBOperations:
     """
     Handles SQLite database operations for weather data.
+    By default all data is kept in one file. With partition_by set to "station"
+    or "decade", each station or decade is stored in its own file instead.
+    Existing single-file data is copied into the partitions the first time
+    a partitioned layout is used.
     """
-    def __init__(self, db_name='weather_data.db'):
+    def __init__(self, db_name='weather_data.db', partition_by=None):
         """
         Initializes the database connection using a safe path.
+        :param db_name: The database file name.
+        :param partition_by: None for a single file, or "station" or "decade".
         """
+        if partition_by is not None and partition_by not in PARTITION_LAYOUTS:
+            raise ValueError(f"Unknown partition layout: {partition_by}")
+
         self.db_name = self.get_safe_path(db_name)
-        self.initialize_db()
+        self.partition_by = partition_by
+        if partition_by:
+            # e.g. weather_data_station/ next to weather_data.db
+            self.partition_dir = f"{os.path.splitext(self.db_name)[0]}_{partition_by}"
+            # Only migrate on first use, so purged partitions are not refilled
+            if not os.path.isdir(self.partition_dir):
+                self.migrate_to_partitions()
+        else:
+            self.initialize_db()
+
+    def migrate_to_partitions(self, batch_size=10000):
+        """
+        Copies every row of the single-file database into a new partition directory.
+        The partitions are built in a staging directory that only replaces the
+        partition directory once the copy is complete, so an interrupted
+        migration is started over on the next run. The single file itself is left untouched.
+        :param batch_size: Number of rows read from the single file at a time.
+        :return: The number of rows copied.
+        """
+        staging_dir = self.partition_dir + ".partial"
+        if os.path.isdir(staging_dir):
+            shutil.rmtree(staging_dir)  # Left over from an interrupted migration
+        os.makedirs(staging_dir)
+
+        copied = self.copy_rows_to_partitions(staging_dir, batch_size)
+        os.replace(staging_dir, self.partition_dir)
+
+        if copied:
+            print(f"Copied {copied} records from {os.path.basename(self.db_name)} "
+                  f"into {self.partition_by} partitions. The original file was kept.")
+        return copied
+
+    def copy_rows_to_partitions(self, target_dir, batch_size):
+        """
+        Copies every row of the single-file database into partition files in target_dir.
+        :param target_dir: Directory the partition files are written to.
+        :param batch_size: Number of rows read from the single file at a time.
+        :return: The number of rows copied.
+        """
+        if not os.path.exists(self.db_name):
+            return 0
+
+        with DBCM(self.db_name) as source:
+            source.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'weather'")
+            if not source.fetchone():
+                return 0
+
+            source.execute('''
+                SELECT sample_date, location, min_temp, max_temp, avg_temp FROM weather
+            ''')
+            copied = 0
+            initialized = set()
+            while True:
+                rows = source.fetchmany(batch_size)
+                if not rows:
+                    break
+
+                rows_by_path = {}
+                for row in rows:
+                    file_name = os.path.basename(self.partition_path(row[1], row[0]))
+                    rows_by_path.setdefault(os.path.join(target_dir, file_name), []).append(row)
+
+                for db_path, path_rows in rows_by_path.items():
+                    if db_path not in initialized:
+                        self.initialize_db(db_path)
+                        initialized.add(db_path)
+                    with DBCM(db_path) as cursor:
+                        # Columns are copied as stored, not re-mapped like save_data does
+                        cursor.executemany('''
+                            INSERT OR IGNORE INTO weather (sample_date, location, min_temp, max_temp, avg_temp)
+                            VALUES (?, ?, ?, ?, ?)
+                        ''', path_rows)
+                copied += len(rows)
+        return copied
 
     def get_safe_path(self, filename):
         """
@@ -32,11 +152,12 @@ class DBOperations:
         os.makedirs(base_path, exist_ok=True)
         return os.path.join(base_path, filename)
 
-    def initialize_db(self):
+    def initialize_db(self, db_path=None):
         """
         Creates the weather table if it doesn't exist.
+        :param db_path: The database file to initialize. Defaults to the main database.
         """
-        with DBCM(self.db_name) as cursor:
+        with DBCM(db_path or self.db_name) as cursor:
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS weather (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -55,53 +176,205 @@ class DBOperations:
         :param location: The location for which to fetch weather data.
         :return: A list of tuples containing the weather data.
         """
-        with DBCM(self.db_name) as cursor:
-            cursor.execute('''
-                SELECT sample_date, min_temp, max_temp, avg_temp FROM weather
-                WHERE location = ?
-                ORDER BY sample_date
-            ''', (location,))
-            return cursor.fetchall()
+        return self.fetch_data_range(location)
+
+    def fetch_data_range(self, location, from_year=None, to_year=None, month=None):
+        """
+        Fetches weather data for a location, optionally limited to a year range and month.
+        :param location: The location for which to fetch weather data.
+        :param from_year: First year to include, or None for no lower bound.
+        :param to_year: Last year to include, or None for no upper bound.
+        :param month: Month (1-12) to include, or None for every month.
+        :return: A list of tuples containing the weather data, ordered by date.
+        """
+        query = '''
+            SELECT sample_date, min_temp, max_temp, avg_temp FROM weather
+            WHERE location = ?
+        '''
+        params = [location]
+        if from_year is not None:
+            query += " AND CAST(substr(sample_date, 1, 4) AS INTEGER) >= ?"
+            params.append(from_year)
+        if to_year is not None:
+            query += " AND CAST(substr(sample_date, 1, 4) AS INTEGER) <= ?"
+            params.append(to_year)
+        if month is not None:
+            query += " AND CAST(substr(sample_date, 6, 2) AS INTEGER) = ?"
+            params.append(month)
+        query += " ORDER BY sample_date"
+
+        # Partitions are visited in date order, so the combined rows stay sorted
+        rows = []
+        for db_path in self.partitions_for(location, from_year, to_year):
+            with DBCM(db_path) as cursor:
+                cursor.execute(query, params)
+                rows.extend(cursor.fetchall())
+        return rows
 
     def save_data(self, data_dict, location="Winnipeg"):
         """
         Saves weather data to the database.
         :param data_dict: A dictionary containing weather data.
         """
-        with DBCM(self.db_name) as cursor:
-            for sample_date, temps in data_dict.items():
-                try:
-                    cursor.execute('''
-                        INSERT OR IGNORE INTO weather (sample_date, location, min_temp, max_temp, avg_temp)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (
-                        sample_date,
-                        location,
-                        temps.get('Max'),
-                        temps.get('Min'),
-                        temps.get('Mean')
-                    ))
-                except Exception as e:
-                    print(f"Error saving data for {sample_date}: {e}")
-
-    def purge_data(self):
-        """
-        Deletes all data from the weather table.
-        """
-        with DBCM(self.db_name) as cursor:
-            cursor.execute('DELETE FROM weather')
+        rows_by_path = {}
+        for sample_date, temps in data_dict.items():
+            rows_by_path.setdefault(self.partition_path(location, sample_date), []).append(
+                (sample_date, temps))
+
+        for db_path, rows in rows_by_path.items():
+            if self.partition_by:
+                self.initialize_db(db_path)
+            with DBCM(db_path) as cursor:
+                for sample_date, temps in rows:
+                    try:
+                        cursor.execute('''
+                            INSERT OR IGNORE INTO weather (sample_date, location, min_temp, max_temp, avg_temp)
+                            VALUES (?, ?, ?, ?, ?)
+                        ''', (
+                            sample_date,
+                            location,
+                            temps.get('Max'),
+                            temps.get('Min'),
+                            temps.get('Mean')
+                        ))
+                    except Exception as e:
+                        print(f"Error saving data for {sample_date}: {e}")
+
+    def purge_data(self, location=None):
+        """
+        Deletes weather data, either for every location or a single one.
+        With a partitioned layout, whole partition files are removed where possible.
+        :param location: The location to purge, or None to purge everything.
+        """
+        if self.partition_by == "station" and location is not None:
+            self.drop_partition(self.partition_path(location))
+            return
+
+        if self.partition_by and location is None:
+            for db_path in self.partition_paths():
+                self.drop_partition(db_path)
+            return
+
+        for db_path in self.partitions_for(location):
+            with DBCM(db_path) as cursor:
+                if location is None:
+                    cursor.execute('DELETE FROM weather')
+                else:
+                    cursor.execute('DELETE FROM weather WHERE location = ?', (location,))
+
+    def drop_partition(self, db_path):
+        """
+        Deletes a partition file, if it exists.
+        :param db_path: Path of the partition file.
+        """
+        if os.path.exists(db_path):
+            os.remove(db_path)
 
     def get_latest_date(self, location="Winnipeg"):
         """
         Gets the most recent sample_date in the DB for a given location.
         """
-        with DBCM(self.db_name) as cursor:
-            cursor.execute('''
-                SELECT MAX(sample_date) FROM weather
-                WHERE location = ?
-            ''', (location,))
-            result = cursor.fetchone()
-            return result[0]
+        # Newest partition first, so decade layouts usually stop after one file
+        for db_path in reversed(self.partitions_for(location)):
+            with DBCM(db_path) as cursor:
+                cursor.execute('''
+                    SELECT MAX(sample_date) FROM weather
+                    WHERE location = ?
+                ''', (location,))
+                result = cursor.fetchone()
+            if result[0]:
+                return result[0]
+        return None
+
+    def get_monthly_stats(self, location=None, from_year=0, to_year=9999):
+        """
+        Computes monthly mean temperature statistics. Each partition is aggregated
+        in its own worker process and the partial results are merged.
+        :param location: The location to include, or None for every location.
+        :param from_year: First year to include.
+        :param to_year: Last year to include.
+        :return: A dictionary keyed by (location, year, month) with count, min, max and mean.
+        """
+        db_paths = self.partitions_for(location, from_year, to_year)
+        args = [(db_path, location, from_year, to_year) for db_path in db_paths]
+
+        if len(db_paths) > 1:
+            with ProcessPoolExecutor(max_workers=min(len(db_paths), os.cpu_count() or 1)) as pool:
+                partials = list(pool.map(aggregate_partition, *zip(*args)))
+        else:
+            partials = [aggregate_partition(*arg) for arg in args]
+
+        stats = {}
+        for rows in partials:
+            for row_location, year, month, count, total, low, high in rows:
+                if not count:
+                    continue
+                key = (row_location, year, month)
+                if key not in stats:
+                    stats[key] = {"count": 0, "total": 0.0, "min": low, "max": high}
+                entry = stats[key]
+                entry["count"] += count
+                entry["total"] += total
+                entry["min"] = min(entry["min"], low)
+                entry["max"] = max(entry["max"], high)
+
+        for entry in stats.values():
+            entry["mean"] = entry.pop("total") / entry["count"]
+        return stats
+
+    def partition_path(self, location, sample_date=None):
+        """
+        Returns the database file that holds a location's data for a given date.
+        :param location: The location of the data.
+        :param sample_date: The sample date (YYYY-MM-DD). Required for the decade layout.
+        """
+        if self.partition_by == "station":
+            # The hash keeps names unique when two locations sanitize to the same text
+            safe_name = re.sub(r"[^A-Za-z0-9_-]", "_", location)
+            name_hash = hashlib.sha1(location.encode("utf-8")).hexdigest()[:8]
+            return os.path.join(self.partition_dir, f"station_{safe_name}_{name_hash}.db")
+        if self.partition_by == "decade":
+            return os.path.join(self.partition_dir, f"decade_{sample_date[:3]}0.db")
+        return self.db_name
+
+    def partition_paths(self):
+        """
+        Returns every existing partition file, sorted by name.
+        Decade files therefore come back in date order.
+        """
+        if not self.partition_by:
+            return [self.db_name]
+        pattern = PARTITION_FILE_PATTERNS[self.partition_by]
+        return sorted(
+            os.path.join(self.partition_dir, name)
+            for name in os.listdir(self.partition_dir)
+            if pattern.fullmatch(name)
+        )
+
+    def partitions_for(self, location=None, from_year=None, to_year=None):
+        """
+        Returns the existing database files that may hold data for a query.
+        :param location: The location queried, or None for every location.
+        :param from_year: First year queried, or None for no lower bound.
+        :param to_year: Last year queried, or None for no upper bound.
+        """
+        if self.partition_by == "station" and location is not None:
+            db_path = self.partition_path(location)
+            return [db_path] if os.path.exists(db_path) else []
+
+        if self.partition_by == "decade":
+            db_paths = []
+            for db_path in self.partition_paths():
+                match = PARTITION_FILE_PATTERNS["decade"].fullmatch(os.path.basename(db_path))
+                decade = int(match.group(1))
+                if from_year is not None and decade + 9 < from_year:
+                    continue
+                if to_year is not None and decade > to_year:
+                    continue
+                db_paths.append(db_path)
+            return db_paths
+
+        return self.partition_paths()
 
 
     def export_to_csv(self, output_path, location="Winnipeg"):
@@ -125,3 +398,29 @@ class DBOperations:
                 writer.writerow(row)
 
         print(f"Data exported to {output_path}")
+
+    def export_monthly_summary_to_csv(self, output_path, location="Winnipeg", from_year=0, to_year=9999):
+        """
+        Exports monthly mean temperature statistics for a location to a CSV file.
+        The statistics come from get_monthly_stats, so partitions are aggregated in parallel.
+        :param output_path: The file path to save the CSV.
+        :param location: The location to export statistics for.
+        :param from_year: First year to include.
+        :param to_year: Last year to include.
+        """
+        stats = self.get_monthly_stats(location, from_year, to_year)
+
+        if not stats:
+            print(f"No data found for location: {location}")
+            return
+
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+        with open(output_path, "w", newline="") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(["Year", "Month", "Days", "Mean Temp", "Lowest Mean", "Highest Mean"])
+            for (_, year, month), entry in sorted(stats.items()):
+                writer.writerow([year, month, entry["count"], round(entry["mean"], 2),
+                                 entry["min"], entry["max"]])
+
+        print(f"Monthly summary exported to {output_path}")
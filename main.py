@@ -1,5 +1,31 @@
+import argparse
+import multiprocessing
 from weather_processor import WeatherProcessor
+from update_scheduler import UpdateScheduler
 
 if __name__ == "__main__":
-    processor = WeatherProcessor()
-    processor.run()
\ No newline at end of file
+    # Needed by the worker processes used for partitioned queries in frozen builds
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="Weather Data Processor")
+    parser.add_argument("--scheduler", action="store_true",
+                        help="run scheduled background updates instead of the menu")
+    parser.add_argument("--interval-hours", type=float, default=24,
+                        help="hours between updates of each location (default: 24)")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="profile every action and write reports to DIR")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="also track memory allocations when profiling")
+    parser.add_argument("--partition", choices=["station", "decade"],
+                        help="store data in separate files per station or decade")
+    args = parser.parse_args()
+    if args.interval_hours <= 0:
+        parser.error("--interval-hours must be greater than 0")
+
+    processor = WeatherProcessor(profile_dir=args.profile,
+                                 track_allocations=args.profile_memory,
+                                 partition_by=args.partition)
+    if args.scheduler:
+        UpdateScheduler(processor, interval_hours=args.interval_hours).run()
+    else:
+        processor.run()
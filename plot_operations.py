@@ -6,6 +6,10 @@ Date: 2025-04-04
 from collections import defaultdict
 from datetime import datetime
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+
+# Number of points drawn by long-range line plots, regardless of the date range.
+DEFAULT_TARGET_POINTS = 2000
 
 
 class PlotOperations:
@@ -13,10 +17,12 @@ class PlotOperations:
     Class for creating boxplots and lineplots from weather data.
     """
 
-    def __init__(self):
+    def __init__(self, defer_show=False):
         """
         Initializes the PlotOperations class.
+        :param defer_show: Render plots without showing them, until show_deferred is called.
         """
+        self.defer_show = defer_show
 
     def create_boxplot(self, weather_data_by_month):
         """
@@ -39,7 +45,7 @@ class PlotOperations:
         plt.ylabel("Mean Temperature")
         plt.grid(True)
         plt.tight_layout()
-        plt.show()
+        self.display()
 
     def create_lineplot(self, daily_data, year, month):
         """
@@ -60,7 +66,83 @@ class PlotOperations:
         plt.xticks(rotation=45, fontsize=8)
         plt.grid(True)
         plt.tight_layout()
-        plt.show()
+        self.display()
+
+    def create_long_range_lineplot(self, daily_data, from_year, to_year,
+                                   target_points=DEFAULT_TARGET_POINTS):
+        """
+        Creates a lineplot of daily mean temperatures spanning several years.
+        The series is downsampled before drawing so render time stays the same
+        for any range length.
+        :param daily_data: List of tuples containing datetime and mean temperature.
+        :param from_year: First year of the data.
+        :param to_year: Last year of the data.
+        :param target_points: Maximum number of points to draw.
+        """
+        sampled = self.downsample_lttb(daily_data, target_points)
+        dates = [date for date, _ in sampled]
+        temps = [temp for _, temp in sampled]
+
+        # Create lineplot on a real date axis, without per-point markers
+        fig, ax = plt.subplots(figsize=(14, 5))
+        ax.plot(dates, temps, linewidth=0.8)
+        locator = mdates.AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        ax.set_title(f"Daily Mean Temperatures - {from_year} to {to_year}"
+                     f" ({len(sampled)} of {len(daily_data)} points)")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Mean Temperature")
+        ax.grid(True)
+        fig.tight_layout()
+        self.display()
+
+    def downsample_lttb(self, daily_data, target_points):
+        """
+        Downsamples a series using Largest-Triangle-Three-Buckets, which keeps
+        the peaks and troughs that give the line its visual shape.
+        :param daily_data: List of (datetime, value) tuples sorted by date.
+        :param target_points: Maximum number of points to keep.
+        :return: A list of (datetime, value) tuples.
+        """
+        size = len(daily_data)
+        if size <= target_points:
+            return list(daily_data)
+        if target_points < 3:
+            # Too few points for triangles, keep the endpoints only
+            return [daily_data[0], daily_data[-1]][:max(target_points, 0)]
+
+        # Day ordinals avoid local-time conversion, which fails before 1970 on Windows
+        xs = [date.toordinal() for date, _ in daily_data]
+        ys = [temp for _, temp in daily_data]
+        sampled = [daily_data[0]]
+        bucket_size = (size - 2) / (target_points - 2)
+        selected = 0  # Index of the last point kept
+
+        for bucket in range(target_points - 2):
+            start = int(bucket * bucket_size) + 1
+            end = int((bucket + 1) * bucket_size) + 1
+
+            # Average of the next bucket, used as the third triangle vertex
+            next_start = end
+            next_end = max(min(int((bucket + 2) * bucket_size) + 1, size), next_start + 1)
+            count = next_end - next_start
+            avg_x = sum(xs[next_start:next_end]) / count
+            avg_y = sum(ys[next_start:next_end]) / count
+
+            point_x = xs[selected]
+            point_y = ys[selected]
+            max_area = -1
+            for index in range(start, end):
+                area = abs((point_x - avg_x) * (ys[index] - point_y)
+                           - (point_x - xs[index]) * (avg_y - point_y))
+                if area > max_area:
+                    max_area = area
+                    selected = index
+            sampled.append(daily_data[selected])
+
+        sampled.append(daily_data[-1])
+        return sampled
 
     def create_boxplot_from_raw_data(self, fetched_data):
         """
@@ -94,6 +176,45 @@ class PlotOperations:
                 print(f"Invalid date format in row {sample_date}: {e}")
         self.create_lineplot(daily_data, year, month)
 
+    def create_long_range_lineplot_from_raw_data(self, fetched_data, from_year, to_year,
+                                                 target_points=DEFAULT_TARGET_POINTS):
+        """
+        Creates a long-range lineplot from raw data fetched from the database.
+        Rows with a missing mean temperature are skipped.
+        :param fetched_data: List of tuples containing sample date, min temp, max temp, and mean temp.
+        :param from_year: First year of the data.
+        :param to_year: Last year of the data.
+        :param target_points: Maximum number of points to draw.
+        """
+        daily_data = []
+        for sample_date, _, _, mean_temp in fetched_data:
+            if mean_temp is None:
+                continue
+            try:
+                daily_data.append((datetime.strptime(sample_date, '%Y-%m-%d'), mean_temp))
+            except Exception as e:
+                print(f"Invalid date format in row {sample_date}: {e}")
+        if not daily_data:
+            print("No mean temperatures available to plot.")
+            return
+        self.create_long_range_lineplot(daily_data, from_year, to_year, target_points)
+
+    def display(self):
+        """
+        Shows the current figure, or only renders it when showing is deferred.
+        """
+        if self.defer_show:
+            plt.gcf().canvas.draw()
+        else:
+            plt.show()
+
+    def show_deferred(self):
+        """
+        Shows any figures rendered while showing was deferred.
+        """
+        if plt.get_fignums():
+            plt.show()
+
     def month_number_to_name(self, month_number):
         """
         Converts a month number to its corresponding month name.
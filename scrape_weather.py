@@ -7,6 +7,8 @@ from datetime import datetime, timedelta
 from html.parser import HTMLParser
 import requests
 
+# Seconds to wait for the server before a request is abandoned
+REQUEST_TIMEOUT = 30
 
 class WeatherScraper(HTMLParser):
     """
@@ -14,7 +16,7 @@ class WeatherScraper(HTMLParser):
      from Environment Canada's climate data website.
     """
 
-    def __init__(self, base_url, start_date, earliest_date=None):
+    def __init__(self, base_url, start_date, earliest_date=None, timeout=REQUEST_TIMEOUT):
         """
         Initializes the WeatherScraper with the base URL, start date,
         and earliest date for scraping.
@@ -22,11 +24,13 @@ class WeatherScraper(HTMLParser):
         :param start_date: The date to start scraping from.
         :param earliest_date: The earliest date to scrape data for.
         If None, it will scrape until the current date.
+        :param timeout: Seconds to wait for each page before giving up.
         """
         super().__init__()
         self.base_url = base_url
         self.start_date = start_date
         self.earliest_date = earliest_date
+        self.timeout = timeout
         self.weather_data = {}
 
         # Flags for parsing
@@ -128,7 +132,11 @@ class WeatherScraper(HTMLParser):
 
             url = self.base_url.format(year=self.current_year, month=self.current_month)
             print(f"Fetching: {url}")
-            response = requests.get(url)
+            try:
+                response = requests.get(url, timeout=self.timeout)
+            except requests.RequestException as e:
+                print(f"Failed to fetch data ({e}). Stopping.")
+                break
 
             if response.status_code != 200:
                 print("Failed to fetch data. Stopping.")
@@ -0,0 +1,47 @@
+import io
+import math
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+import matplotlib
+matplotlib.use("Agg")  # Never open a window
+import matplotlib.pyplot as plt
+from plot_operations import PlotOperations
+
+def make_series(size, start=datetime(1840, 1, 1)):
+    return [(start + timedelta(days=i), math.sin(i / 50) * 20) for i in range(size)]
+
+def check(name, condition):
+    print(f"{'PASS' if condition else 'FAIL'}: {name}")
+    assert condition, name
+
+def main():
+    plotter = PlotOperations()
+
+    # Shorter than the target: returned unchanged
+    series = make_series(100)
+    check("size <= target keeps every point", plotter.downsample_lttb(series, 100) == series)
+
+    # Targets too small for triangles still respect the maximum
+    series = make_series(1000)
+    check("target 2 keeps endpoints", plotter.downsample_lttb(series, 2) == [series[0], series[-1]])
+    check("target 1 keeps one point", len(plotter.downsample_lttb(series, 1)) == 1)
+
+    # Multi-decade range starting before 1970
+    series = make_series(60000)
+    sampled = plotter.downsample_lttb(series, 2000)
+    check("reduced to target", len(sampled) == 2000)
+    check("endpoints kept", sampled[0] == series[0] and sampled[-1] == series[-1])
+    check("dates strictly increasing",
+          all(a[0] < b[0] for a, b in zip(sampled, sampled[1:])))
+
+    # Empty input, e.g. every mean temperature was missing
+    check("empty input", plotter.downsample_lttb([], 2000) == [])
+    rows = [("1900-01-01", None, None, None), ("1900-01-02", None, None, None)]
+    output = io.StringIO()
+    with redirect_stdout(output):
+        plotter.create_long_range_lineplot_from_raw_data(rows, 1900, 1900)
+    check("all-None rows report no data", "No mean temperatures available to plot." in output.getvalue())
+    check("all-None rows draw no figure", not plt.get_fignums())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from db_operations import DBOperations
+
+def make_data(start, days, offset=0.0):
+    data = {}
+    for i in range(days):
+        date_str = (start + timedelta(days=i)).strftime("%Y-%m-%d")
+        data[date_str] = {"Max": i % 30 + offset, "Min": i % 30 - 10 + offset, "Mean": i % 30 - 5 + offset}
+    return data
+
+def rounded(stats):
+    return {key: {name: round(value, 6) for name, value in entry.items()}
+            for key, entry in stats.items()}
+
+def check(name, condition):
+    print(f"{'PASS' if condition else 'FAIL'}: {name}")
+    assert condition, name
+
+def main():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        # Single file with two stations spread over several decades
+        db_name = os.path.join(temp_dir, "weather.db")
+        single = DBOperations(db_name)
+        single.save_data(make_data(datetime(1975, 1, 1), 365 * 30), "Winnipeg")
+        single.save_data(make_data(datetime(1995, 6, 1), 365 * 10, offset=2.5), "St. John's")
+        single.save_data(make_data(datetime(2001, 1, 1), 365, offset=-1), "St_ John_s")
+
+        # Migration copies every row
+        decade = DBOperations(db_name, "decade")
+        check("decade layout has several files", len(decade.partition_paths()) > 2)
+        for location in ("Winnipeg", "St. John's", "St_ John_s"):
+            check(f"decade migration keeps {location}",
+                  decade.fetch_data(location) == single.fetch_data(location))
+        check("decade range pruning",
+              decade.fetch_data_range("Winnipeg", 1988, 1991) == single.fetch_data_range("Winnipeg", 1988, 1991))
+        check("latest date", decade.get_latest_date("Winnipeg") == single.get_latest_date("Winnipeg"))
+
+        # Merged parallel aggregates equal the single-file aggregate
+        check("merged monthly stats, all locations",
+              rounded(decade.get_monthly_stats()) == rounded(single.get_monthly_stats()))
+        check("merged monthly stats, one location and range",
+              rounded(decade.get_monthly_stats("Winnipeg", 1980, 2001))
+              == rounded(single.get_monthly_stats("Winnipeg", 1980, 2001)))
+
+        # Purging a station drops only its own file
+        station = DBOperations(db_name, "station")
+        check("station layout has one file per station", len(station.partition_paths()) == 3)
+        kept = station.fetch_data("St_ John_s")
+        station.purge_data("St. John's")
+        check("purged station is empty", station.fetch_data("St. John's") == [])
+        check("similar station name kept", station.fetch_data("St_ John_s") == kept)
+        check("other station kept", station.fetch_data("Winnipeg") == single.fetch_data("Winnipeg"))
+        check("only one file dropped", len(station.partition_paths()) == 2)
+
+        # An interrupted migration is retried on the next run
+        original_initialize = DBOperations.initialize_db
+        calls = []
+        def interrupted_initialize(self, db_path=None):
+            calls.append(db_path)
+            if len(calls) == 2:
+                raise KeyboardInterrupt
+            original_initialize(self, db_path)
+
+        retry_name = os.path.join(temp_dir, "retry.db")
+        shutil.copy(db_name, retry_name)
+        DBOperations.initialize_db = interrupted_initialize
+        try:
+            DBOperations(retry_name, "decade")
+        except KeyboardInterrupt:
+            print("Migration interrupted.")
+        finally:
+            DBOperations.initialize_db = original_initialize
+
+        retried = DBOperations(retry_name, "decade")
+        check("interrupted migration is retried",
+              retried.fetch_data("Winnipeg") == single.fetch_data("Winnipeg"))
+    finally:
+        shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Description: Background scheduler that keeps every configured location up to date.
+Author: Jake Licmo
+Date: 2026-10-19
+"""
+import random
+import threading
+from datetime import datetime, timedelta
+
+
+class UpdateScheduler:
+    """
+    Runs incremental updates for each location on a fixed interval.
+    Locations are given evenly spaced slots across the interval, with random
+    jitter, so scraping is spread out instead of happening all at once.
+    """
+
+    def __init__(self, processor, interval_hours=24, jitter_minutes=30, stuck_after_hours=2):
+        """
+        Initializes the scheduler.
+        :param processor: The WeatherProcessor whose locations are updated.
+        :param interval_hours: Hours between two updates of the same location.
+        :param jitter_minutes: Maximum random offset added to each scheduled run.
+        :param stuck_after_hours: Hours after which a running update is reported as stuck.
+        """
+        if interval_hours <= 0:
+            raise ValueError("interval_hours must be greater than 0")
+
+        self.processor = processor
+        self.interval = timedelta(hours=interval_hours)
+        self.jitter = timedelta(minutes=jitter_minutes)
+        self.stuck_after = timedelta(hours=stuck_after_hours)
+        self.stop_event = threading.Event()
+
+        # Per-location state: one lock each so a location never runs twice at once
+        self.locks = {location: threading.Lock() for location in processor.locations}
+        self.started_at = {}
+        self.reported_stuck = set()
+        self.next_slot = {}
+
+        now = datetime.now()
+        spacing = self.interval / max(len(processor.locations), 1)
+        for index, location in enumerate(processor.locations):
+            self.next_slot[location] = now + spacing * index
+
+    def run(self):
+        """
+        Main loop. Starts due updates on worker threads until stopped or interrupted.
+        """
+        print(f"Update scheduler started for: {', '.join(self.next_slot)}")
+        due = {location: self.add_jitter(slot) for location, slot in self.next_slot.items()}
+
+        try:
+            while not self.stop_event.is_set():
+                now = datetime.now()
+                for location, due_time in due.items():
+                    if due_time > now:
+                        continue
+                    self.start_update(location, now)
+
+                    # Advance from the slot, not the run time, so runs don't drift
+                    self.next_slot[location] += self.interval
+                    due[location] = self.add_jitter(self.next_slot[location])
+
+                self.check_stuck(now)
+                wait = min(due.values()) - datetime.now()
+                self.stop_event.wait(min(max(wait.total_seconds(), 1), 60))
+        except KeyboardInterrupt:
+            print("Stopping update scheduler.")
+            self.stop()
+
+    def stop(self):
+        """
+        Stops the main loop. Updates already running are left to finish.
+        """
+        self.stop_event.set()
+
+    def add_jitter(self, slot):
+        """
+        Returns the slot time shifted by a random amount within the jitter window.
+        """
+        return slot + self.jitter * random.random()
+
+    def start_update(self, location, now):
+        """
+        Starts an update for a location on a worker thread, unless one is already running.
+        :param location: The location to update.
+        :param now: The time the update is started.
+        """
+        lock = self.locks[location]
+        if not lock.acquire(blocking=False):
+            print(f"Update for {location} is still running, skipping this slot.")
+            return
+
+        self.started_at[location] = now
+        worker = threading.Thread(target=self.run_update, args=(location, lock),
+                                  name=f"update-{location}", daemon=True)
+        worker.start()
+
+    def run_update(self, location, lock):
+        """
+        Runs an incremental update for a location and releases its lock when done.
+        :param location: The location to update.
+        :param lock: The lock acquired for this location.
+        """
+        try:
+            # Skip quickly without scraping when the data is already current
+            latest_str = self.processor.db.get_latest_date(location)
+            if latest_str and latest_str >= datetime.today().strftime("%Y-%m-%d"):
+                print(f"Weather data for {location} is already up-to-date.")
+                return
+            self.processor.run_action(self.processor.incremental_update, location, latest_str)
+        except Exception as e:
+            print(f"Scheduled update for {location} failed: {e}")
+        finally:
+            self.started_at.pop(location, None)
+            self.reported_stuck.discard(location)
+            lock.release()
+
+    def check_stuck(self, now):
+        """
+        Reports updates that have been running longer than the stuck threshold.
+        Each stuck run is reported once.
+        :param now: The current time.
+        """
+        for location, started in list(self.started_at.items()):
+            if now - started > self.stuck_after and location not in self.reported_stuck:
+                print(f"WARNING: update for {location} has been running since "
+                      f"{started.strftime('%Y-%m-%d %H:%M')}, it may be stuck.")
+                self.reported_stuck.add(location)
@@ -7,25 +7,33 @@ Date: 2025-04-04
 from datetime import timedelta
 from datetime import datetime
 from scrape_weather import WeatherScraper
-from db_operations import DBOperations, DBCM
+from db_operations import DBOperations
 from plot_operations import PlotOperations
+from action_profiler import ActionProfiler
 
 class WeatherProcessor:
     """
     Main class to handle the weather data processing workflow.
     """
-    def __init__(self):
+    def __init__(self, profile_dir=None, track_allocations=False, partition_by=None):
         """
         Initializes the WeatherProcessor with necessary components.
+        :param partition_by: Storage layout passed to DBOperations (None, "station" or "decade").
+        :param profile_dir: If given, every action is profiled and its report written here.
+        :param track_allocations: Also track memory allocations while profiling.
         """
         self.scraper = WeatherScraper
-        self.db = DBOperations()
-        self.plotter = PlotOperations()
+        self.db = DBOperations(partition_by=partition_by)
+        # When profiling, plots are rendered in the action and shown after it, so viewing time is not profiled
+        self.plotter = PlotOperations(defer_show=bool(profile_dir))
         self.base_url = (
             "http://climate.weather.gc.ca/climate_data/daily_data_e.html"
             "?StationID=27174&timeframe=2&StartYear=1840&EndYear={year}"
             "&Day=1&Year={year}&Month={month}#"
         )
+        # Locations kept up to date by update_data and the update scheduler
+        self.locations = {"Winnipeg": self.base_url}
+        self.profiler = ActionProfiler(profile_dir, track_allocations) if profile_dir else None
 
     def show_menu(self):
         """
@@ -37,7 +45,9 @@ class WeatherProcessor:
         print("3. Update weather data")
         print("4. Generate box plot (year range)")
         print("5. Generate line plot (month & year)")
-        print("6. Exit")
+        print("6. Generate line plot (year range)")
+        print("7. Export monthly summary to CSV (year range)")
+        print("8. Exit")
 
     def run(self):
         """
@@ -58,6 +68,10 @@ class WeatherProcessor:
             elif choice == '5':
                 self.generate_line_plot()
             elif choice == '6':
+                self.generate_long_range_line_plot()
+            elif choice == '7':
+                self.monthly_summary_export()
+            elif choice == '8':
                 print("Exiting program.")
                 break
             elif choice == 'x':  # hidden purge option
@@ -65,6 +79,18 @@ class WeatherProcessor:
             else:
                 print("Invalid choice. Please try again.\n")
 
+    def run_action(self, action, *args, **kwargs):
+        """
+        Runs an action, under the profiler when profiling is enabled.
+        Menu actions collect their input first and pass only the work here,
+        so time spent waiting on the user is not profiled.
+        :param action: The method to run, e.g. self.full_scrape.
+        :return: Whatever the action returns.
+        """
+        if self.profiler:
+            return self.profiler.run(action, *args, **kwargs)
+        return action(*args, **kwargs)
+
     def download_data(self):
         """
         Performs a full scrape from a user-defined earliest year and stores data in the DB.
@@ -72,20 +98,27 @@ class WeatherProcessor:
         try:
             earliest_year = int(input("Enter earliest year to start scrape (e.g. 2022): "))
             earliest_date = datetime(earliest_year, 1, 1)
-            location = "Winnipeg"
+        except ValueError:
+            print("Invalid input. Please enter a numeric year.")
+            return
 
-            print(f"Scraping weather data from today back to {earliest_date.strftime('%Y-%m-%d')}...")
-            scraper = WeatherScraper(self.base_url, datetime.today(), earliest_date.date())
-            raw_data = scraper.scrape()
+        self.run_action(self.full_scrape, earliest_date)
 
-            if raw_data:
-                self.db.save_data(raw_data, location)
-                print(f"Download complete. {len(raw_data)} records inserted into the database.")
-            else:
-                print("No data was scraped.")
+    def full_scrape(self, earliest_date, location="Winnipeg"):
+        """
+        Scrapes from today back to earliest_date and stores the data in the DB.
+        :param earliest_date: The earliest date to scrape.
+        :param location: The location to scrape. Must be a key of self.locations.
+        """
+        print(f"Scraping weather data from today back to {earliest_date.strftime('%Y-%m-%d')}...")
+        scraper = WeatherScraper(self.locations[location], datetime.today(), earliest_date.date())
+        raw_data = scraper.scrape()
 
-        except ValueError:
-            print("Invalid input. Please enter a numeric year.")
+        if raw_data:
+            self.db.save_data(raw_data, location)
+            print(f"Download complete. {len(raw_data)} records inserted into the database.")
+        else:
+            print("No data was scraped.")
 
     def csv_export(self):
         """
@@ -95,10 +128,34 @@ class WeatherProcessor:
             file_path = input("Enter the output CSV file path (e.g. weather_data/export.csv): ").strip()
             if not file_path.endswith(".csv"):
                 file_path += ".csv"
-            self.db.export_to_csv(file_path)
+            self.run_action(self.db.export_to_csv, file_path)
         except Exception as e:
             print(f"Failed to export data: {e}")
 
+    def monthly_summary_export(self):
+        """
+        Exports monthly mean temperature statistics over a specified year range to a CSV file.
+        """
+        try:
+            from_year = int(input("Enter starting year (e.g. 1990): "))
+            to_year = int(input("Enter ending year (e.g. 2024): "))
+        except ValueError:
+            print("Invalid input. Please enter valid numeric years.")
+            return
+
+        if from_year > to_year:
+            print("Starting year cannot be greater than ending year.")
+            return
+
+        try:
+            file_path = input("Enter the output CSV file path (e.g. weather_data/summary.csv): ").strip()
+            if not file_path.endswith(".csv"):
+                file_path += ".csv"
+            self.run_action(self.db.export_monthly_summary_to_csv, file_path,
+                            "Winnipeg", from_year, to_year)
+        except Exception as e:
+            print(f"Failed to export summary: {e}")
+
     def update_data(self):
         """
         Updates the weather data in the database by scraping new data from the web.
@@ -114,38 +171,47 @@ class WeatherProcessor:
                 try:
                     earliest_year = int(input("Enter earliest year to start full scrape (e.g. 2022): "))
                     earliest_date = datetime(earliest_year, 1, 1)
-
-                    print(f"Scraping weather data from today back to {earliest_date.strftime('%Y-%m-%d')}...")
-                    scraper = WeatherScraper(self.base_url, datetime.today(), earliest_date.date())
-                    raw_data = scraper.scrape()
-
-                    if raw_data:
-                        self.db.save_data(raw_data, location)
-                        print(f"Full scrape complete. {len(raw_data)} records inserted.")
-                    else:
-                        print("No data was scraped.")
                 except ValueError:
                     print("Invalid year input.")
+                    return
+                self.run_action(self.full_scrape, earliest_date, location)
             else:
                 print("Update canceled.")
             return
 
+        self.run_action(self.incremental_update, location, latest_str)
+
+    def incremental_update(self, location="Winnipeg", latest_str=None):
+        """
+        Scrapes and saves any days newer than the latest date stored for a location.
+        Does not prompt, so it can also be used by the background update scheduler.
+        :param location: The location to update. Must be a key of self.locations.
+        :param latest_str: Latest sample_date already in the DB, looked up if not given.
+        :return: The number of records scraped, 0 if nothing was done.
+        """
+        if latest_str is None:
+            latest_str = self.db.get_latest_date(location)
+
+        if not latest_str:
+            print(f"No existing data found for {location}. Run a full download first.")
+            return 0
+
         try: # Finds the latest date in the DB
             latest_date = datetime.strptime(latest_str, "%Y-%m-%d").date()
         except ValueError:
             print("Could not parse latest date from DB.")
-            return
+            return 0
 
         today = datetime.today().date()
 
         if latest_date >= today:
-            print("Weather data is already up-to-date.")
-            return
+            print(f"Weather data for {location} is already up-to-date.")
+            return 0
 
-        print(f"Scraping data from {latest_date + timedelta(days=1)} to {today}...")
+        print(f"Scraping {location} data from {latest_date + timedelta(days=1)} to {today}...")
 
         scraper = WeatherScraper(
-            base_url=self.base_url,
+            base_url=self.locations[location],
             start_date=datetime.today(),  # always scrape backwards from today
             earliest_date=latest_date + timedelta(days=1)  # stop when reaching this
         )
@@ -157,6 +223,7 @@ class WeatherProcessor:
             print(f"{len(data)} new records inserted.")
         else:
             print("No new data found.")
+        return len(data)
 
     def generate_box_plot(self):
         """
@@ -170,23 +237,24 @@ class WeatherProcessor:
                 print("Starting year cannot be greater than ending year.")
                 return
 
-            with DBCM(self.db.db_name) as cursor:
-                cursor.execute('''
-                    SELECT sample_date, min_temp, max_temp, avg_temp FROM weather
-                    WHERE location = ? AND
-                        CAST(substr(sample_date, 1, 4) AS INTEGER) BETWEEN ? AND ?
-                    ORDER BY sample_date
-                ''', ("Winnipeg", from_year, to_year))
-                data = cursor.fetchall()
-
-            if not data:
-                print("No data available in the specified range.")
-                return
-
-            self.plotter.create_boxplot_from_raw_data(data)
-
         except ValueError:
             print("Invalid input. Please enter valid numeric years.")
+            return
+
+        self.run_action(self.plot_box_range, from_year, to_year)
+        self.show_plots()
+
+    def plot_box_range(self, from_year, to_year):
+        """
+        Fetches the data for a year range and draws its box plot.
+        """
+        data = self.db.fetch_data_range("Winnipeg", from_year, to_year)
+
+        if not data:
+            print("No data available in the specified range.")
+            return
+
+        self.plotter.create_boxplot_from_raw_data(data)
 
     def generate_line_plot(self):
         """
@@ -200,32 +268,73 @@ class WeatherProcessor:
                 print("Month must be between 1 and 12.")
                 return
 
-            with DBCM(self.db.db_name) as cursor:
-                cursor.execute('''
-                    SELECT sample_date, min_temp, max_temp, avg_temp FROM weather
-                    WHERE location = ? AND
-                        CAST(substr(sample_date, 1, 4) AS INTEGER) = ? AND
-                        CAST(substr(sample_date, 6, 2) AS INTEGER) = ?
-                    ORDER BY sample_date
-                ''', ("Winnipeg", year, month))
-                data = cursor.fetchall()
-
-            if not data:
-                print("No data available for that month and year.")
-                return
+        except ValueError:
+            print("Invalid input. Please enter numeric values for year and month.")
+            return
+
+        self.run_action(self.plot_month, year, month)
+        self.show_plots()
+
+    def plot_month(self, year, month):
+        """
+        Fetches the data for one month and draws its line plot.
+        """
+        data = self.db.fetch_data_range("Winnipeg", year, year, month)
 
-            self.plotter.create_lineplot_from_raw_data(data, year, month)
+        if not data:
+            print("No data available for that month and year.")
+            return
+
+        self.plotter.create_lineplot_from_raw_data(data, year, month)
+
+    def generate_long_range_line_plot(self):
+        """
+        Generates a downsampled line plot for daily mean temperatures over a specified year range.
+        """
+        try:
+            from_year = int(input("Enter starting year (e.g. 1990): "))
+            to_year = int(input("Enter ending year (e.g. 2024): "))
+
+            if from_year > to_year:
+                print("Starting year cannot be greater than ending year.")
+                return
 
         except ValueError:
-            print("Invalid input. Please enter numeric values for year and month.")
+            print("Invalid input. Please enter valid numeric years.")
+            return
+
+        self.run_action(self.plot_long_range, from_year, to_year)
+        self.show_plots()
+
+    def plot_long_range(self, from_year, to_year):
+        """
+        Fetches the data for a year range and draws its downsampled line plot.
+        """
+        data = self.db.fetch_data_range("Winnipeg", from_year, to_year)
+
+        if not data:
+            print("No data available in the specified range.")
+            return
+
+        self.plotter.create_long_range_lineplot_from_raw_data(data, from_year, to_year)
+
+    def show_plots(self):
+        """
+        Shows plots drawn during a profiled action. Without profiling,
+        plots are already shown by the action itself.
+        """
+        if self.profiler:
+            self.plotter.show_deferred()
 
     def purge_all_data(self):
         """
-        Purges all weather data from the database after user confirmation.
+        Purges weather data for one location, or all locations, after user confirmation.
         """
-        confirm = input("⚠️  DEV: This will permanently delete all weather data. Are you sure? (y/n): ").strip().lower()
+        location = input("Enter a location to purge (leave blank for all): ").strip() or None
+        target = f"all {location} weather data" if location else "all weather data"
+        confirm = input(f"⚠️  DEV: This will permanently delete {target}. Are you sure? (y/n): ").strip().lower()
         if confirm == 'y':
-            self.db.purge_data()
-            print("All weather data has been purged from the database.")
+            self.run_action(self.db.purge_data, location)
+            print(f"{target[0].upper()}{target[1:]} has been purged from the database.")
         else:
             print("Purge cancelled.")